@@ -0,0 +1,82 @@
+import os
+import threading
+
+import arcade
+
+
+# Всё, что нужно уровню: грузится в фоне, пока открыто главное меню
+LEVEL_TEXTURES = [
+    "sprites/idle_r.png",
+    "sprites/idle_l.png",
+    "sprites/move_r.png",
+    "sprites/move_l.png",
+    "sprites/wall.png",
+    "sprites/spikes.png",
+]
+LEVEL_SOUNDS = [
+    "sound/169913__mydo1__skydive.wav",
+    "sound/242740__marlonhj__engine.wav",
+    "sound/536769__egomassive__tire.ogg",
+]
+
+_textures = {}
+_sounds = {}
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+_preloader = None
+
+
+def _load(cache, path, loader):
+    """
+    Returns cache[path], calling loader(path) on first use.
+    Cached assets are returned without locking; a load only blocks
+    other requests for the same path, not the whole cache.
+    """
+    if path in cache:
+        return cache[path]
+    with _path_locks_lock:
+        lock = _path_locks.setdefault(path, threading.Lock())
+    with lock:
+        if path not in cache:
+            cache[path] = loader(path)
+    return cache[path]
+
+
+def _load_sound(path):
+    if not os.path.exists(path):
+        print(f"Sound file not found: {path}")
+        return None
+    try:
+        return arcade.load_sound(path)
+    except Exception as e:
+        print(f"Error loading sound {path}: {e}")
+        return None
+
+
+def texture(path):
+    """Returns the texture at path, decoding it only on first use."""
+    return _load(_textures, path, arcade.load_texture)
+
+
+def sound(path):
+    """
+    Returns the sound at path, loading it only on first use.
+    Missing or unreadable files give None, so callers can play nothing.
+    """
+    return _load(_sounds, path, _load_sound)
+
+
+def _preload(textures, sounds):
+    for path in textures:
+        texture(path)
+    for path in sounds:
+        sound(path)
+
+
+def preload(textures=LEVEL_TEXTURES, sounds=LEVEL_SOUNDS):
+    """Starts loading assets on a background thread; does nothing if already started."""
+    global _preloader
+    if _preloader is None:
+        _preloader = threading.Thread(target=_preload, args=(textures, sounds), daemon=True)
+        _preloader.start()
+    return _preloader
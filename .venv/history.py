@@ -0,0 +1,174 @@
+import os
+import queue
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+
+DB_PATH = "stats/runs.db"
+LEGACY_STATS_PATH = "stats/stats.txt"
+
+WIN = "win"
+LOSE = "lose"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished_at TEXT,
+    level INTEGER NOT NULL,
+    seed INTEGER,
+    time REAL NOT NULL,
+    hp INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_level_outcome_time ON runs (level, outcome, time);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def format_time(seconds):
+    """Formats seconds as MM:SS.mmm."""
+    minutes, milliseconds = divmod(round(seconds * 1000), 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+
+
+def parse_time(text):
+    """Parses MM:SS.mmm back into seconds."""
+    minutes, seconds = text.split(":")
+    return int(minutes) * 60 + float(seconds)
+
+
+def parse_legacy_stats(path=LEGACY_STATS_PATH):
+    """
+    Reads the free-form stats.txt written by older versions.
+    Returns (finished_at, level, seed, time, hp, outcome) rows.
+    """
+    rows = []
+    record = {}
+    finished_at = None
+
+    def flush():
+        nonlocal record
+        if "level" in record and "time" in record:
+            rows.append((record.get("finished_at"), record["level"], None, record["time"],
+                         record.get("hp", 0), record.get("outcome", LOSE)))
+        record = {}
+
+    with open(path, encoding="UTF-8") as file:
+        for line in file:
+            line = line.strip()
+            key, _, value = line.partition(":")
+            value = value.strip()
+            if not line:
+                flush()
+            elif key == "Уровень":
+                flush()
+                record = {"level": int(value), "finished_at": finished_at}
+                finished_at = None
+            elif key == "Время":
+                record["time"] = parse_time(value)
+            elif key == "Здоровье":
+                record["hp"] = int(value.split("/")[0])
+                record["outcome"] = WIN
+            elif key == "Причина":
+                record["outcome"] = LOSE
+            else:
+                try:
+                    finished_at = datetime.fromisoformat(line).isoformat(sep=" ")
+                except ValueError:
+                    pass
+    flush()
+    return rows
+
+
+class RunHistory:
+    """
+    Run results in SQLite, written in batches by a background thread.
+    Winning times are also kept per level in sorted lists that are
+    updated on every record, so best-time and percentile queries never
+    touch the database and stay instant however many runs are stored.
+    """
+
+    def __init__(self, path=DB_PATH, legacy_path=LEGACY_STATS_PATH):
+        self.path = path
+        self.leaderboards = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with sqlite3.connect(path) as db:
+            db.executescript(SCHEMA)
+            imported = db.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+            if not imported and os.path.exists(legacy_path):
+                db.executemany(
+                    "INSERT INTO runs (finished_at, level, seed, time, hp, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+                    parse_legacy_stats(legacy_path)
+                )
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('legacy_imported', '1')")
+
+            for level, time in db.execute(
+                "SELECT level, time FROM runs WHERE outcome = ? ORDER BY level, time", (WIN,)
+            ):
+                self.leaderboards.setdefault(level, []).append(time)
+        db.close()
+
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def record(self, level, seed, time, hp, outcome):
+        """Queues a finished run for writing and updates the leaderboards at once."""
+        self.queue.put((datetime.now().isoformat(sep=" "), level, seed, time, hp, outcome))
+        if outcome == WIN:
+            insort(self.leaderboards.setdefault(level, []), time)
+
+    def best_time(self, level):
+        times = self.leaderboards.get(level)
+        return times[0] if times else None
+
+    def percentile(self, level, q):
+        """Returns the winning time at percentile q (0-100) for a level."""
+        times = self.leaderboards.get(level)
+        if not times:
+            return None
+        return times[min(int(len(times) * q / 100), len(times) - 1)]
+
+    def faster_than(self, level, time):
+        """Returns the share (0-100) of recorded wins on a level slower than time."""
+        times = self.leaderboards.get(level)
+        if not times:
+            return 100.0
+        return (len(times) - bisect_right(times, time)) / len(times) * 100
+
+    def rank(self, level, time):
+        """Returns the 1-based leaderboard place a time would take."""
+        return bisect_left(self.leaderboards.get(level, []), time) + 1
+
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = None in batch
+            rows = [row for row in batch if row is not None]
+            if rows:
+                db.executemany(
+                    "INSERT INTO runs (finished_at, level, seed, time, hp, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                db.commit()
+            if closing:
+                db.close()
+                return
+
+    def close(self):
+        """Flushes queued runs and stops the writer thread. Safe to call twice."""
+        if not self.writer.is_alive():
+            return
+        self.queue.put(None)
+        self.writer.join()
@@ -0,0 +1,50 @@
+import arcade
+from pyglet.graphics import Batch
+
+
+class Hud:
+    """
+    Retained-mode HUD: labels are created once per view in a shared Batch,
+    and a label's text is only replaced when its formatted value changes.
+    Counts text relayouts and shows how many happened in the last second.
+    """
+
+    def __init__(self, width, show_relayouts=True):
+        self.batch = Batch()
+        self.labels = {}
+        self.formats = {}
+        self.texts = {}
+        self.relayouts = 0
+        self.relayouts_per_second = 0
+        self.timer = 0.0
+        self.show_relayouts = show_relayouts
+
+        if show_relayouts:
+            self.add("relayouts", "Relayouts/s: {}", width - 10, 10, 10, arcade.color.GRAY, anchor_x="right")
+
+    def add(self, name, fmt, x, y, font_size, color=arcade.color.WHITE, anchor_x="left"):
+        """Creates a label; fmt is a str.format template for its value."""
+        self.formats[name] = fmt
+        self.texts[name] = ""
+        self.labels[name] = arcade.Text(
+            "", x, y, color, font_size=font_size, anchor_x=anchor_x, batch=self.batch
+        )
+
+    def set(self, name, value):
+        text = self.formats[name].format(value)
+        if self.texts[name] != text:
+            self.texts[name] = text
+            self.labels[name].text = text
+            self.relayouts += 1
+
+    def update(self, delta_time):
+        self.timer += delta_time
+        if self.timer >= 1.0:
+            self.relayouts_per_second = round(self.relayouts / self.timer)
+            self.relayouts = 0
+            self.timer = 0.0
+            if self.show_relayouts:
+                self.set("relayouts", self.relayouts_per_second)
+
+    def draw(self):
+        self.batch.draw()
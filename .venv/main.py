@@ -0,0 +1,832 @@
+from email.iterators import typed_subpart_iterator
+
+import arcade
+from arcade import gui
+from math import *
+import numpy as np
+import os
+from numpy.random.mtrand import Sequence
+from datetime import datetime
+
+import assets
+from history import LOSE, WIN, RunHistory, format_time
+from hud import Hud
+from particles import ParticleSystem
+from profiler import frame_profiler
+from sim import FIXED_DT, BatchState, Inputs, SimState, normalize, step, step_batch
+from terrain import LEVELS, load_level
+
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+SCREEN_TITLE = "Damage Boost"
+
+MIN_WIND_SPEED = 450.0 
+MAX_WIND_SPEED = 2000.0  
+WIND_VOLUME_RANGE = (0.1, 0.8)
+WIND_PITCH_RANGE = (0.8, 1.5) 
+
+ENGINE_MIN_SPEED = 50.0
+ENGINE_VOLUME_RANGE = (0.1, 0.6)
+ENGINE_PITCH_RANGE = (0.7, 1.3)
+
+BRAKE_THRESHOLD = 100.0 
+BRAKE_MIN_DURATION = 0.3 
+
+MAX_FRAME_TIME = 0.25  # Больше за кадр не догоняем, чтобы не уйти в спираль
+GHOST_COUNT = 3  # Сколько прошлых заездов показывать призраками
+GHOST_ALPHA = 90
+GHOST_MAX_FRAMES = 60 * 60 * 3  # Дольше трёх минут ввод не записывается, призрак дальше стоит
+
+
+class Arme(arcade.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.scale = 4.0
+        self.speed = 30
+        self.health = 100
+
+        self.dust_timer = 0.0
+        self.last_ground_x = self.center_x 
+
+        self.idle_r = assets.texture("sprites/idle_r.png")
+        self.idle_l = assets.texture("sprites/idle_l.png")
+        self.move_r = assets.texture("sprites/move_r.png")
+        self.move_l = assets.texture("sprites/move_l.png")
+
+        self.texture = self.idle_r
+
+        self.center_x = SCREEN_WIDTH // 2
+        self.center_y = SCREEN_HEIGHT + 400
+
+        # Physics
+        self.face_direction = 1
+        self.is_walking = False
+        self.is_airborne = False
+        self.lerp = 0.1
+        self.ground = None
+        ## Constants
+        self.mass = 10
+        self.ys = 0.0
+        self.xs = 0.0
+        self.friction = 0.9
+        self.air_friction = 0.00005
+        self.jump_force = 0
+        self.old_x = self.center_x
+        self.old_y = self.center_y
+        self.speed_limit = 250.0
+        self.boost = 50.0
+
+        self.ang = None
+
+        self.speed = 0.0  
+        self.prev_speed = 0.0  
+        self.wind_sound_player = None
+        self.engine_sound_player = None
+        self.brake_sound_player = None
+        self.brake_sound_timer = 0.0
+        self.load_sounds()
+
+    def load_sounds(self):
+        # Звуки общие для всех экземпляров и уже подгружены в фоне из меню
+        self.wind_sound = assets.sound("sound/169913__mydo1__skydive.wav")
+        self.engine_sound = assets.sound("sound/242740__marlonhj__engine.wav")
+        self.brake_sound = assets.sound("sound/536769__egomassive__tire.ogg")
+
+    def sync(self, state, x, y, delta_time):
+        """Переносит состояние симуляции на спрайт: позиция, анимация и звуки"""
+        self.center_x = x
+        self.center_y = y
+        self.xs = state.xs
+        self.ys = state.ys
+        self.face_direction = state.face_direction
+        self.is_airborne = state.is_airborne
+        self.ground = state.ground
+
+        self.prev_speed = self.speed
+        self.speed = state.speed
+
+        self.update_animation(delta_time)
+        self.update_sounds(delta_time)
+
+    def update_sounds(self, delta_time):
+        if self.brake_sound_timer > 0:
+            self.brake_sound_timer -= delta_time
+            if self.brake_sound_timer <= 0 and self.brake_sound_player:
+                self.brake_sound_player.pause()
+
+        if not self.is_airborne or self.speed < MIN_WIND_SPEED:
+            if self.wind_sound_player and self.wind_sound_player.playing:
+                self.wind_sound_player.pause()
+        else:
+            wind_intensity = normalize(self.speed, MIN_WIND_SPEED, MAX_WIND_SPEED, 0.0, 1.0)
+            wind_intensity = max(0.0, min(1.0, wind_intensity))  # Ограничиваем 0-1
+
+            volume = normalize(wind_intensity, 0.0, 1.0, WIND_VOLUME_RANGE[0], WIND_VOLUME_RANGE[1])
+            pitch = normalize(wind_intensity, 0.0, 1.0, WIND_PITCH_RANGE[0], WIND_PITCH_RANGE[1])
+
+            if self.wind_sound and not self.is_airborne:
+                if not self.wind_sound_player or not self.wind_sound_player.playing:
+                    self.wind_sound_player = self.wind_sound.play(
+                        volume=volume,
+                        loop=True
+                    )
+                else:
+                    self.wind_sound_player.volume = volume
+                    self.wind_sound_player.pitch = pitch
+
+        if self.is_airborne or not self.engine_sound:
+            pass
+        else:
+            engine_intensity = normalize(abs(self.xs), ENGINE_MIN_SPEED, MAX_WIND_SPEED, 0.0, 1.0)
+            engine_intensity = max(0.0, min(1.0, engine_intensity))
+
+            volume = normalize(engine_intensity, 0.0, 1.0, ENGINE_VOLUME_RANGE[0], ENGINE_VOLUME_RANGE[1])
+            pitch = normalize(engine_intensity, 0.0, 1.0, ENGINE_PITCH_RANGE[0], ENGINE_PITCH_RANGE[1])
+
+            if not self.engine_sound_player or not self.engine_sound_player.playing:
+                self.engine_sound_player = self.engine_sound.play(
+                    volume=volume,
+                    #pitch=pitch,
+                    loop=True
+                )
+            else:
+                self.engine_sound_player.volume = volume
+                self.engine_sound_player.pitch = pitch
+
+        if self.brake_sound:
+            speed_drop = self.prev_speed - self.speed
+
+            if speed_drop > BRAKE_THRESHOLD and self.speed > 100:
+                if self.brake_sound_player and self.brake_sound_player.playing:
+                    self.brake_sound_player.pause()
+
+                brake_intensity = normalize(speed_drop, BRAKE_THRESHOLD, 1000.0, 0.3, 1.0)
+                brake_intensity = max(0.3, min(1.0, brake_intensity))
+
+                self.brake_sound_player = self.brake_sound.play(
+                    volume=brake_intensity * 0.7,  # Немного тише
+                )
+                self.brake_sound_timer = BRAKE_MIN_DURATION
+
+    def update_animation(self, delta_time):
+        self.is_walking = abs(self.xs) > 15
+        if self.is_walking and not self.is_airborne:
+            if self.face_direction == -1:
+                self.texture = self.move_l
+            elif self.face_direction == 1:
+                self.texture = self.move_r
+        elif self.face_direction == -1:
+            self.texture = self.idle_l
+        elif self.face_direction == 1:
+            self.texture = self.idle_r
+
+    def on_close(self):
+        if self.wind_sound_player and self.wind_sound_player.playing:
+            self.wind_sound_player.pause()
+        if self.engine_sound_player and self.engine_sound_player.playing:
+            self.engine_sound_player.pause()
+        if self.brake_sound_player and self.brake_sound_player.playing:
+            self.brake_sound_player.pause()
+
+        super().on_close()
+
+
+class MainMenuView(arcade.View):
+    def __init__(self):
+        super().__init__()
+        self.manager = arcade.gui.UIManager()
+        self.manager.enable()
+
+        self.background_color = arcade.color.BLACK
+
+        self.v_box = arcade.gui.UIBoxLayout()
+
+        title_label = arcade.gui.UILabel(
+            text="DAMAGE BOOST",
+            font_size=48,
+            font_name="Kenney Future",
+            text_color=arcade.color.WHITE
+        )
+        self.v_box.add(title_label)
+
+        level1_button = arcade.gui.UIFlatButton(
+            text="Уровень 1: Обучение",
+            width=300,
+            height=50
+        )
+        level1_button.on_click = self.on_level1_click
+        self.v_box.add(level1_button)
+
+        level2_button = arcade.gui.UIFlatButton(
+            text="Уровень 2: Склоны",
+            width=300,
+            height=50
+        )
+        level2_button.on_click = self.on_level2_click
+        self.v_box.add(level2_button)
+
+        level3_button = arcade.gui.UIFlatButton(
+            text="Уровень 3: Экстрим",
+            width=300,
+            height=50
+        )
+        level3_button.on_click = self.on_level3_click
+        self.v_box.add(level3_button)
+
+        level4_button = arcade.gui.UIFlatButton(
+            text="Уровень 4: Бесконечный",
+            width=300,
+            height=50
+        )
+        level4_button.on_click = self.on_level4_click
+        self.v_box.add(level4_button)
+
+        self.records_label = arcade.gui.UILabel(
+            text="",
+            font_size=12,
+            text_color=arcade.color.GRAY
+        )
+        self.v_box.add(self.records_label)
+
+        exit_button = arcade.gui.UIFlatButton(
+            text="Выход",
+            width=200,
+            height=40
+        )
+        exit_button.on_click = self.on_exit_click
+        self.v_box.add(exit_button)
+
+        anchor = arcade.gui.UIAnchorLayout()
+        anchor.add(
+            anchor_x="center_x",
+            anchor_y="center_y",
+            child=self.v_box
+        )
+        self.manager.add(anchor)
+
+        self.selected_level = None
+
+        self.menu_music = assets.sound("sound/menu_music.wav")
+        self.music_player = None
+
+        # Пока игрок в меню, ассеты уровней грузятся в фоне
+        assets.preload()
+
+    def on_show_view(self):
+        self.manager.enable()
+
+        # Рекорд по времени есть только у уровней с финишем
+        records = []
+        for level in sorted(LEVELS):
+            if LEVELS[level]["world_len"] is None:
+                continue
+            best = self.window.history.best_time(level)
+            records.append(f"{level}: {format_time(best) if best is not None else '--:--.---'}")
+        self.records_label.text = "Рекорды  " + "   ".join(records)
+        self.records_label.fit_content()
+
+        if self.menu_music and (not self.music_player or not self.music_player.playing):
+            self.music_player = self.menu_music.play(loop=True, volume=0.3)
+
+    def on_hide_view(self):
+        """Вызывается при скрытии меню"""
+        self.manager.disable()
+
+    def on_draw(self):
+        """Отрисовка меню"""
+        self.clear()
+
+
+
+        arcade.draw_text(
+            "Выберите уровень",
+            SCREEN_WIDTH // 2,
+            SCREEN_HEIGHT - 100,
+            arcade.color.LIGHT_GRAY,
+            font_size=24,
+            anchor_x="center",
+            font_name="Kenney Future"
+        )
+
+        arcade.draw_text(
+            "ESC - Вернуться в меню",
+            SCREEN_WIDTH // 2,
+            30,
+            arcade.color.GRAY,
+            font_size=14,
+            anchor_x="center"
+        )
+
+        self.manager.draw()
+
+    def on_level1_click(self, event):
+        """Запуск уровня 1"""
+        print("Запуск уровня 1")
+        self.selected_level = 1
+        self.start_game()
+
+    def on_level2_click(self, event):
+        """Запуск уровня 2"""
+        print("Запуск уровня 2")
+        self.selected_level = 2
+        self.start_game()
+
+    def on_level3_click(self, event):
+        """Запуск уровня 3"""
+        print("Запуск уровня 3")
+        self.selected_level = 3
+        self.start_game()
+
+    def on_level4_click(self, event):
+        """Запуск бесконечного уровня"""
+        print("Запуск уровня 4")
+        self.selected_level = 4
+        self.start_game()
+
+    def on_exit_click(self, event):
+        """Выход из игры"""
+        print("Выход из игры")
+        arcade.close_window()
+
+    def start_game(self):
+        """Запуск игры с выбранным уровнем"""
+        if self.selected_level:
+            game_view = GameView(level=self.selected_level)
+            self.window.show_view(game_view)
+
+    def on_key_press(self, key, modifiers):
+        """Обработка нажатий клавиш в меню"""
+        if key == arcade.key.ESCAPE:
+            # В меню ESC ничего не делает
+            pass
+        elif key == arcade.key.ENTER:
+            self.selected_level = 1
+            self.start_game()
+
+
+class GameView(arcade.View):
+    """Игровой экран с физикой"""
+
+    def __init__(self, level=1, seed=None):
+        super().__init__()
+        self.level = level
+        self.seed = seed
+
+        # Создаем и настраиваем окно игры
+        self.pev = Arme()
+        self.pev_list = arcade.SpriteList()
+        self.pev_list.append(self.pev)
+        self.ghost_runs = []  # Ввод прошлых заездов, проигрывается призраками
+        self.ghost_list = arcade.SpriteList()
+        self.recorded_inputs = np.zeros((GHOST_MAX_FRAMES, 4), dtype=bool)
+        self.keys_pressed = set()
+        self.time = 0
+        self.hp = 100
+        self.world_len = 32000
+        self.walls = arcade.SpriteList()
+        self.spikes = arcade.SpriteList()
+        self.game_over = False  # Флаг завершения игры
+        self.win = False  # Победа или поражение
+        self.end_time = 0.0  # Время завершения
+
+        self.end_manager = arcade.gui.UIManager()
+        self.setup_end_screen()
+
+        self.dust = ParticleSystem(64)
+        self.sparks = ParticleSystem(32, radii=(1, 2), lifetime=0.5, alpha=255, drag=(0.98, 0.98), gravity=-600)
+
+        self.world_camera = arcade.camera.Camera2D()
+        self.gui_camera = arcade.camera.Camera2D()
+
+        self.hud = Hud(SCREEN_WIDTH)
+        self.hud.add("time", "Time: {}", 0, 0, 14)
+        self.hud.add("speed", "Speed {}", 0, 50, 25)
+        self.hud.add("hp", "HP: {}", 0, 100, 35)
+        self.hud.add("total_speed", "Скорость: {} u/s", 0, 160, 16, arcade.color.LIGHT_GRAY)
+        self.hud.add("level", "Уровень {}", 10, SCREEN_HEIGHT - 30, 18, arcade.color.LIGHT_GRAY)
+        self.hud.set("level", self.level)
+
+        # F3 - оверлей профилировщика, F4 - выгрузка замеров в файл
+        self.profile_overlay = Hud(SCREEN_WIDTH, show_relayouts=False)
+        self.profile_timer = 0.0
+
+        self.setup_level()
+
+
+        self.is_paused = False
+
+
+        self.pause_manager = arcade.gui.UIManager()
+        self.pause_manager.enable()
+        self.setup_pause_menu()
+
+    def setup_end_screen(self):
+        self.end_manager.enable()
+
+        end_v_box = arcade.gui.UIBoxLayout()
+
+        self.end_title = arcade.gui.UILabel(
+            text="",
+            font_size=48,
+            font_name="Kenney Future",
+            text_color=arcade.color.WHITE
+        )
+        end_v_box.add(self.end_title)
+
+        self.end_stats = arcade.gui.UILabel(
+            text="",
+            font_size=24,
+            text_color=arcade.color.LIGHT_GRAY
+        )
+        end_v_box.add(self.end_stats)
+
+        restart_button = arcade.gui.UIFlatButton(
+            text="Играть снова",
+            width=250,
+            height=45
+        )
+        restart_button.on_click = self.on_restart_click
+        end_v_box.add(restart_button)
+
+        menu_button = arcade.gui.UIFlatButton(
+            text="В главное меню",
+            width=250,
+            height=45
+        )
+        menu_button.on_click = self.on_end_menu_click
+        end_v_box.add(menu_button)
+
+        end_layout = arcade.gui.UIAnchorLayout()
+        end_layout.add(
+            anchor_x="center_x",
+            anchor_y="center_y",
+            child=end_v_box
+        )
+
+        self.end_manager.add(end_layout)
+        self.end_manager.disable()
+
+    def on_restart_click(self, event):
+        """Перезапуск текущего уровня"""
+        self.game_over = False
+        self.win = False
+        self.hp = 100
+        self.time = 0.0
+        self.end_manager.disable()
+
+        self.setup_level()
+
+    def on_end_menu_click(self, event):
+        """Возврат в главное меню"""
+        menu_view = MainMenuView()
+        self.window.show_view(menu_view)
+
+    def end_game(self, win):
+        """Завершение игры (победа/поражение)"""
+        self.game_over = True
+        self.win = win
+        self.end_time = self.time
+
+        self.ghost_runs = (self.ghost_runs + [self.recorded_inputs[:self.recorded_frames].copy()])[-GHOST_COUNT:]
+
+        if win:
+            self.end_title.text = "УРОВЕНЬ ПРОЙДЕН!"
+            self.end_title.text_color = arcade.color.GOLD
+        else:
+            self.end_title.text = "ПОРАЖЕНИЕ"
+            self.end_title.text_color = arcade.color.RED
+
+        time_str = format_time(self.end_time)
+        history = self.window.history
+
+        if win:
+            # Сравниваем с прошлыми заездами до записи текущего
+            faster_than = history.faster_than(self.level, self.end_time)
+            rank = history.rank(self.level, self.end_time)
+            history.record(self.level, self.heightfield.seed, self.end_time, self.hp, WIN)
+            self.end_stats.text = (
+                f"Уровень: {self.level} \n"
+                f"Время: {time_str} \n"
+                f"Здоровье: {self.hp}/100 \n"
+                f"Рекорд: {format_time(history.best_time(self.level))} \n"
+                f"Место: {rank}, медиана: {format_time(history.percentile(self.level, 50))} \n"
+                f"Быстрее {faster_than:.0f}% заездов"
+            )
+        else:
+            history.record(self.level, self.heightfield.seed, self.end_time, self.hp, LOSE)
+            # На бесконечном уровне результат - пройденное расстояние
+            distance = f"Дистанция: {round(self.state.x)}\n " if self.heightfield.finish_x is None else ""
+            self.end_stats.text = (
+                f"Уровень: {self.level} \n"
+                f"Время: {time_str}\n "
+                f"{distance}"
+                f"Причина: здоровье закончилось"
+            )
+
+        self.end_manager.enable()
+
+        # Останавливаем игровые звуки
+        if hasattr(self.pev, 'wind_sound_player') and self.pev.wind_sound_player:
+            self.pev.wind_sound_player.pause()
+        if hasattr(self.pev, 'engine_sound_player') and self.pev.engine_sound_player:
+            self.pev.engine_sound_player.pause()
+
+    def setup_level(self):
+        self.dust.clear()
+        self.sparks.clear()
+
+        # Уровни кешируются по (level, seed), рельеф подгружается чанками
+        self.heightfield, self.terrain = load_level(self.level, self.seed)
+        self.world_len = self.heightfield.world_len
+
+        # Физика живёт в SimState, спрайт только отображает её
+        self.state = SimState(self.heightfield)
+        self.prev_state = self.state
+        self.accumulator = 0.0
+        self.recorded_frames = 0
+        self.setup_ghosts()
+        self.time = self.state.time
+        self.hp = self.state.hp
+        self.pev.sync(self.state, self.state.x, self.state.y, 0)
+
+        self.terrain.update(self.pev.center_x)
+        self.walls = self.terrain.walls
+        self.spikes = self.terrain.spikes
+
+    def setup_ghosts(self):
+        """Призраки прошлых заездов: все шагают одним step_batch по записанному вводу"""
+        self.ghost_list.clear()
+        self.ghosts = None
+        if not self.ghost_runs:
+            return
+
+        n = len(self.ghost_runs)
+        self.ghost_inputs = np.zeros((max(len(run) for run in self.ghost_runs), n, 4), dtype=bool)
+        for i, run in enumerate(self.ghost_runs):
+            self.ghost_inputs[:len(run), i] = run
+
+        self.ghosts = BatchState(self.heightfield, n)
+        self.prev_ghosts = self.ghosts
+        for _ in range(n):
+            ghost = arcade.Sprite(self.pev.idle_r, scale=self.pev.scale)
+            ghost.alpha = GHOST_ALPHA
+            self.ghost_list.append(ghost)
+
+    def step_ghosts(self):
+        frame = self.state.frame - 1
+        if frame < len(self.ghost_inputs):
+            inputs = self.ghost_inputs[frame]
+        else:
+            inputs = Inputs()
+        self.prev_ghosts = self.ghosts
+        self.ghosts = step_batch(self.ghosts, inputs)
+
+    def setup_pause_menu(self):
+        """Настройка меню паузы"""
+        self.pause_v_box = arcade.gui.UIBoxLayout()
+
+        self.pause_widget = arcade.gui.UIAnchorLayout()
+        self.pause_widget.add(
+            anchor_x="center_x",
+            anchor_y="center_y",
+            child=self.pause_v_box
+        )
+        self.pause_manager.add(self.pause_widget)
+
+        resume_button = arcade.gui.UIFlatButton(
+            text="Продолжить",
+            width=250,
+            height=45
+        )
+        resume_button.on_click = self.on_resume_click
+        self.pause_v_box.add(resume_button)
+
+        menu_button = arcade.gui.UIFlatButton(
+            text="В главное меню",
+            width=250,
+            height=45
+        )
+        menu_button.on_click = self.on_menu_click
+        self.pause_v_box.add(menu_button)
+
+        self.pause_widget = arcade.gui.UIAnchorLayout(
+            anchor_x="center",
+            anchor_y="center",
+            child=self.pause_v_box
+        )
+        self.pause_manager.add(self.pause_widget)
+        self.pause_manager.disable()
+
+    def on_resume_click(self, event):
+        """Продолжить игру"""
+        self.is_paused = False
+        self.pause_manager.disable()
+
+    def on_menu_click(self, event):
+        """Вернуться в главное меню"""
+        self.is_paused = False
+        menu_view = MainMenuView()
+        self.window.show_view(menu_view)
+
+    def on_show_view(self):
+        """Вызывается при показе игрового экрана"""
+        self.pause_manager.disable()
+
+    def on_draw(self):
+        """Отрисовка игрового экрана"""
+        self.world_camera.use()
+        self.clear()
+
+        with frame_profiler.scope("draw_particles"):
+            self.dust.draw()
+            self.sparks.draw()
+
+        with frame_profiler.scope("draw_sprites"):
+            self.ghost_list.draw(pixelated=True)
+            self.pev_list.draw(pixelated=True)
+            self.spikes.draw(pixelated=True)
+            self.walls.draw(pixelated=True)
+
+        self.gui_camera.use()
+        with frame_profiler.scope("draw_hud"):
+            self.hud.draw()
+        if frame_profiler.enabled:
+            self.profile_overlay.draw()
+
+        if self.game_over: self.end_manager.draw()
+        if self.is_paused: self.pause_manager.draw()
+        frame_profiler.end_frame()
+
+    def on_update(self, delta_time):
+        """Обновление игровой логики"""
+        if self.is_paused or self.game_over:
+            return
+
+        frame_profiler.begin_frame()
+
+        inputs = Inputs(
+            left=arcade.key.LEFT in self.keys_pressed,
+            right=arcade.key.RIGHT in self.keys_pressed,
+            up=arcade.key.UP in self.keys_pressed,
+            down=arcade.key.DOWN in self.keys_pressed
+        )
+
+        # Симуляция идёт фиксированным шагом, кадр лишь догоняет накопленное время
+        with frame_profiler.scope("sim"):
+            self.accumulator += min(delta_time, MAX_FRAME_TIME)
+            while self.accumulator >= FIXED_DT:
+                self.prev_state = self.state
+                self.state = step(self.state, inputs)
+                if self.recorded_frames < GHOST_MAX_FRAMES:
+                    self.recorded_inputs[self.recorded_frames] = inputs
+                    self.recorded_frames += 1
+                if self.ghosts:
+                    with frame_profiler.scope("ghosts"):
+                        self.step_ghosts()
+                self.accumulator -= FIXED_DT
+
+                if self.state.hp < self.prev_state.hp:
+                    self.sparks.emit(
+                        self.state.x,
+                        self.state.bottom,
+                        20,
+                        vx=(-250, 250),
+                        vy=(100, 400),
+                        colors=((230, 255), (120, 200), (0, 60))
+                    )
+                if self.state.outcome:
+                    break
+
+        self.hp = self.state.hp
+        self.time = self.state.time
+        if self.state.outcome:
+            self.end_game(win=self.state.outcome == "win")
+            return
+
+        # Рисуем промежуточное положение между двумя последними шагами
+        alpha = self.accumulator / FIXED_DT
+        prev, state = self.prev_state, self.state
+        with frame_profiler.scope("player"):
+            self.pev.sync(
+                state,
+                prev.x + (state.x - prev.x) * alpha,
+                prev.y + (state.y - prev.y) * alpha,
+                delta_time
+            )
+
+        if self.ghosts:
+            prev, ghosts = self.prev_ghosts, self.ghosts
+            xs = prev.x + (ghosts.x - prev.x) * alpha
+            ys = prev.y + (ghosts.y - prev.y) * alpha
+            for ghost, x, y in zip(self.ghost_list, xs.tolist(), ys.tolist()):
+                ghost.position = x, y
+
+        with frame_profiler.scope("terrain"):
+            self.terrain.update(self.pev.center_x)
+
+        with frame_profiler.scope("particles"):
+            if not self.pev.is_airborne and abs(self.pev.xs) > 50:
+                self.pev.dust_timer += delta_time
+                if self.pev.dust_timer >= 0.05:
+                    self.pev.dust_timer = 0
+
+                    particle_count = min(int(abs(self.pev.xs) / 100), 5)
+                    offset_x = -10 if self.pev.face_direction == 1 else 10
+                    drift = self.pev.xs * 0.1
+                    self.dust.emit(
+                        self.pev.center_x + offset_x,
+                        self.pev.bottom + 5,  # Чуть ниже ног
+                        particle_count,
+                        vx=(-30 + drift, 30 + drift),
+                        vy=(5, 25),
+                        colors=((150, 200), (150, 180), (100, 150))
+                    )
+
+            self.dust.update(delta_time)
+            self.sparks.update(delta_time)
+
+        with frame_profiler.scope("camera"):
+            position = (
+                self.pev.center_x + self.pev.xs * 0.3,
+                self.pev.center_y + self.pev.ys * 0.1
+            )
+            self.world_camera.position = arcade.math.lerp_2d(
+                self.world_camera.position,
+                position,
+                self.pev.lerp,
+            )
+
+        with frame_profiler.scope("hud"):
+            self.hud.set("speed", round(self.pev.xs))
+            self.hud.set("total_speed", int(self.pev.speed))
+            self.hud.set("time", round(self.time))
+            self.hud.set("hp", round(self.hp))
+            self.hud.update(delta_time)
+
+        if frame_profiler.enabled:
+            self.update_profile_overlay(delta_time)
+
+    def update_profile_overlay(self, delta_time):
+        """Четыре раза в секунду обновляет p50/p99 по фазам кадра"""
+        self.profile_timer += delta_time
+        if self.profile_timer < 0.25:
+            return
+        self.profile_timer = 0.0
+
+        for i, (name, (p50, p99)) in enumerate(frame_profiler.stats().items()):
+            if name not in self.profile_overlay.labels:
+                self.profile_overlay.add(
+                    name, "{}", SCREEN_WIDTH - 10, SCREEN_HEIGHT - 20 - 16 * i, 10,
+                    arcade.color.YELLOW, anchor_x="right"
+                )
+            self.profile_overlay.set(name, f"{name}: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+    def on_key_press(self, key, modifiers):
+        """Обработка нажатий клавиш"""
+        self.keys_pressed.add(key)
+
+        if key == arcade.key.F3:
+            frame_profiler.toggle()
+        elif key == arcade.key.F4 and frame_profiler.frames:
+            path = f"stats/profile_{datetime.now():%Y%m%d_%H%M%S}.csv"
+            frame_profiler.export(path)
+            print("Профиль сохранён:", path)
+
+        # ESC - пауза/меню
+        if key == arcade.key.ESCAPE:
+            self.is_paused = not self.is_paused
+            if self.is_paused:
+                self.pause_manager.enable()
+            else:
+                self.pause_manager.disable()
+
+    def on_key_release(self, key, modifiers):
+        """Обработка отпускания клавиш"""
+        if key in self.keys_pressed:
+            self.keys_pressed.remove(key)
+
+
+class DamageBoost(arcade.Window):
+    """Главное окно приложения"""
+
+    def __init__(self):
+        super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+        arcade.set_background_color(arcade.color.BLACK)
+
+        # История заездов пишется в фоне, рекорды читаются из памяти
+        self.history = RunHistory()
+
+        # Показываем главное меню при запуске
+        menu_view = MainMenuView()
+        self.show_view(menu_view)
+
+    def close(self):
+        # Кнопка выхода закрывает окно через arcade.close_window() мимо on_close
+        self.history.close()
+        super().close()
+
+
+if __name__ == "__main__":
+    app = DamageBoost()
+    app.run()
@@ -0,0 +1,96 @@
+import arcade
+import numpy as np
+
+
+_circle_textures = {}
+
+
+def circle_texture(radius):
+    """Returns a shared white circle texture; particles tint it with their color."""
+    if radius not in _circle_textures:
+        _circle_textures[radius] = arcade.make_circle_texture(radius * 2, arcade.color.WHITE)
+    return _circle_textures[radius]
+
+
+class ParticleSystem:
+    """
+    Fixed-capacity particle pool stored in NumPy arrays.
+    All live particles are updated in one vectorized pass and drawn
+    with one SpriteList call using pre-baked circle textures, so spawning
+    allocates nothing once the pool is built.
+
+    drag - per-update velocity multipliers (x, y), gravity - y acceleration, u/s^2.
+    """
+
+    def __init__(self, capacity, radii=(1, 2, 3), lifetime=0.4, alpha=150, drag=(0.95, 0.9), gravity=0.0):
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.alpha = alpha
+        self.drag = np.array(drag, dtype=float)
+        self.gravity = gravity
+        self.rng = np.random.default_rng()
+
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.textures = [circle_texture(r) for r in radii]
+        self.sprites = arcade.SpriteList(capacity=capacity)
+        for _ in range(capacity):
+            sprite = arcade.Sprite(self.textures[0])
+            sprite.visible = False
+            self.sprites.append(sprite)
+
+    def emit(self, x, y, count, vx=(-20, 20), vy=(5, 15), colors=((200, 200), (200, 200), (200, 200))):
+        """
+        Spawns up to count particles at (x, y) into free slots.
+        vx, vy and each channel of colors are (low, high) ranges.
+        """
+        slots = np.flatnonzero(~self.alive)[:count]
+        n = len(slots)
+        if n == 0:
+            return
+
+        self.pos[slots] = x, y
+        self.vel[slots, 0] = self.rng.uniform(*vx, n)
+        self.vel[slots, 1] = self.rng.uniform(*vy, n)
+        self.life[slots] = 0.0
+        self.alive[slots] = True
+
+        rgb = np.stack([self.rng.integers(lo, hi, n, endpoint=True) for lo, hi in colors], axis=1)
+        texture_idx = self.rng.integers(0, len(self.textures), n)
+        for slot, color, t in zip(slots.tolist(), rgb.tolist(), texture_idx.tolist()):
+            sprite = self.sprites[slot]
+            sprite.texture = self.textures[t]
+            sprite.color = (*color, self.alpha)
+            sprite.visible = True
+
+    def update(self, delta_time):
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return
+
+        self.life[live] += delta_time
+        self.pos[live] += self.vel[live] * delta_time
+        self.vel[live] *= self.drag
+        self.vel[live, 1] += self.gravity * delta_time
+
+        alpha = (self.alpha * (1 - self.life[live] / self.lifetime)).astype(int)
+        dead = (self.life[live] >= self.lifetime) | (alpha <= 0)
+        self.alive[live[dead]] = False
+
+        for slot in live[dead].tolist():
+            self.sprites[slot].visible = False
+        for slot, (x, y), a in zip(live[~dead].tolist(), self.pos[live[~dead]].tolist(), alpha[~dead].tolist()):
+            sprite = self.sprites[slot]
+            sprite.position = x, y
+            sprite.alpha = a
+
+    def clear(self):
+        for slot in np.flatnonzero(self.alive).tolist():
+            self.sprites[slot].visible = False
+        self.alive[:] = False
+
+    def draw(self):
+        self.sprites.draw()
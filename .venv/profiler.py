@@ -0,0 +1,94 @@
+from contextlib import nullcontext
+from time import perf_counter
+
+import numpy as np
+
+
+MAX_PHASES = 16
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    def __init__(self, profiler, column):
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.samples[self.profiler.row, self.column] += perf_counter() - self.start
+
+
+class Profiler:
+    """
+    Named timing scopes collected into a fixed-size ring buffer of frames.
+    Each frame is one row, each phase one column; repeated scopes within
+    a frame add up. Scopes outside begin_frame()/end_frame() are ignored,
+    so frames that skip the update (pause, end screen) leave no partial
+    rows. While disabled, scope() hands out a shared no-op context manager
+    and begin_frame() returns at once.
+    """
+
+    def __init__(self, capacity=600, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.samples = np.zeros((capacity, MAX_PHASES))
+        self.phases = {}
+        self.scopes = {}
+        self.row = 0
+        self.frames = 0
+        self.in_frame = False
+
+    def scope(self, name):
+        if not self.in_frame:
+            return _NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            if len(self.phases) >= MAX_PHASES:
+                return _NULL_SCOPE
+            self.phases[name] = len(self.phases)
+            scope = self.scopes[name] = _Scope(self, self.phases[name])
+        return scope
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.row = self.frames % self.capacity
+        self.samples[self.row] = 0.0
+        self.in_frame = True
+
+    def end_frame(self):
+        self.in_frame = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.in_frame = False
+        if self.enabled:
+            self.samples[:] = 0.0
+            self.frames = 0
+            self.row = 0
+
+    def history(self):
+        """Returns the recorded frames in chronological order, in milliseconds."""
+        count = min(self.frames, self.capacity)
+        rows = (np.arange(self.frames - count, self.frames) + 1) % self.capacity
+        return self.samples[rows, :len(self.phases)] * 1000
+
+    def stats(self):
+        """Returns {phase: (p50, p99)} in milliseconds over the ring buffer."""
+        history = self.history()
+        if len(history) == 0:
+            return {}
+        p50, p99 = np.percentile(history, [50, 99], axis=0)
+        return {name: (p50[column], p99[column]) for name, column in self.phases.items()}
+
+    def export(self, path):
+        """Writes the ring buffer to a CSV file, one frame per line."""
+        np.savetxt(path, self.history(), delimiter=",", fmt="%.4f",
+                   header=",".join(self.phases), comments="")
+
+
+frame_profiler = Profiler()
@@ -0,0 +1,388 @@
+from collections import namedtuple
+from copy import copy
+from math import floor, radians, sqrt
+
+import numpy as np
+
+from profiler import frame_profiler
+from terrain import CHUNK_TILES, TILE_LEN, Heightfield
+
+
+FIXED_DT = 1 / 60
+GRAVITY = 12
+
+GROUND_CONTACT = 1.0  # Допуск касания поверхности, px
+PLAYER_HALF_SIZE = 32  # Половина хитбокса игрока, px
+SPIKE_HALF_WIDTH = 33
+SPIKE_HALF_HEIGHT = 17
+
+MOVE_SPEED = 1000
+AIR_CONTROL = 0
+JUMP_SPEED = 400
+BOOST_POWER = 1000
+MAX_SPEED = 2000
+MAX_FALL_SPEED = 800
+SLOPE_DAMPING = 0.9
+FLAT_FRICTION = 0.95
+SLOPE_MIN_ANGLE = radians(0.1)  # Склоны положе считаются плоскими
+
+SPIKE_DAMAGE = 30
+SPIKE_KNOCKBACK = 400
+INVULNERABLE_TIME = 3.0
+
+# Нажатые клавиши на один шаг симуляции
+Inputs = namedtuple("Inputs", ["left", "right", "up", "down"], defaults=(False, False, False, False))
+
+
+def normalize(value, old_min, old_max, new_min, new_max):
+    return (value - old_min) * (new_max - new_min) / (old_max - old_min) + new_min
+
+
+def calc_slope_collision(surface, xs, ys, delta_time=FIXED_DT, gravity=GRAVITY, damping=SLOPE_DAMPING):
+    """
+    Calculate slope collision with surf/slide physics.
+    Takes the terrain Surface under the player (see Heightfield.surface).
+    Returns the updated xs and ys.
+    """
+    nx, ny = surface.normal
+
+    normal_speed = xs * nx + ys * ny
+
+    if normal_speed < 0:
+        xs -= normal_speed * nx
+        ys -= normal_speed * ny
+
+        # Составляющая гравитации вдоль склона
+        xs += gravity * ny * nx * delta_time * 60  # Ускорение
+        ys += (gravity * ny * ny - gravity) * delta_time * 60
+
+    rad_velocity = normalize(sqrt(xs * xs + ys * ys), 0, 2000, 0, radians(90))
+    if rad_velocity < surface.angle + 0.5:
+        return xs * damping, ys * damping
+    return xs, ys
+
+
+class SimState:
+    """
+    Complete physical state of one run, independent of any window.
+    step() never mutates a state, so the previous and current states
+    can be kept side by side for interpolation and replays.
+    """
+
+    def __init__(self, heightfield, x=400, y=500, xs=0.0, ys=-200.0):
+        self.heightfield = heightfield
+        self.x = x
+        self.y = y
+        self.xs = xs
+        self.ys = ys
+        self.face_direction = 1
+        self.is_airborne = False
+        self.ground = None
+        self.hp = 100
+        self.time = 0.0
+        self.frame = 0
+        self.invulnerable = 0.0
+        self.outcome = None  # None, "win" или "lose"
+
+    @property
+    def bottom(self):
+        return self.y - PLAYER_HALF_SIZE
+
+    @property
+    def speed(self):
+        return sqrt(self.xs * self.xs + self.ys * self.ys)
+
+
+def hits_spike(state):
+    """Checks the player box against the spikes of the nearby chunks."""
+    chunk_width = CHUNK_TILES * TILE_LEN
+    reach = PLAYER_HALF_SIZE + SPIKE_HALF_WIDTH
+    first = floor((state.x - reach) / chunk_width)
+    last = floor((state.x + reach) / chunk_width)
+    for chunk in range(first, last + 1):
+        x, y, _ = state.heightfield.spikes(chunk)
+        if np.any((np.abs(x - state.x) < reach) & (np.abs(y - state.y) < PLAYER_HALF_SIZE + SPIKE_HALF_HEIGHT)):
+            return True
+    return False
+
+
+def step(state, inputs, dt=FIXED_DT):
+    """Advances the simulation by one fixed timestep. Returns a new SimState."""
+    if state.outcome:
+        return state
+    s = copy(state)
+
+    if s.hp <= 0:
+        s.outcome = "lose"
+        return s
+
+    # У бесконечного уровня финиша нет: заезд кончается только потерей здоровья
+    finish_x = s.heightfield.finish_x
+    if finish_x is not None and (s.x >= finish_x or s.y < -500):
+        s.outcome = "win"
+        return s
+
+    s.y += s.ys * dt
+    s.x += s.xs * dt
+
+    # Левый край мира - стена, рельефа за ним нет
+    if s.x < PLAYER_HALF_SIZE:
+        s.x = PLAYER_HALF_SIZE
+        s.xs = max(s.xs, 0)
+
+    with frame_profiler.scope("spikes"):
+        s.invulnerable = max(s.invulnerable - dt, 0.0)
+        if s.invulnerable == 0 and hits_spike(s):
+            s.hp -= SPIKE_DAMAGE
+            s.y += 25
+            s.ys += SPIKE_KNOCKBACK
+            s.invulnerable = INVULNERABLE_TIME
+
+    with frame_profiler.scope("collision"):
+        # Рельеф - функция от x: опрашиваем поверхность под игроком и прижимаем его за один шаг
+        ground = s.heightfield.surface(s.x)
+        s.ground = ground
+        s.is_airborne = ground is None or s.bottom > ground.height + GROUND_CONTACT
+
+        if not s.is_airborne:
+            if s.bottom < ground.height:
+                s.y = ground.height + PLAYER_HALF_SIZE
+
+            if abs(ground.angle) > SLOPE_MIN_ANGLE:
+                s.xs, s.ys = calc_slope_collision(ground, s.xs, s.ys, dt)
+            else:
+                s.ys = max(s.ys, 0)
+                s.xs *= FLAT_FRICTION
+        else:
+            s.ys -= GRAVITY * dt * 60
+
+            if s.ys < -MAX_FALL_SPEED:
+                s.ys = -MAX_FALL_SPEED
+
+    # ============ CONTROLS ============
+    with frame_profiler.scope("controls"):
+        control = 1 if not s.is_airborne else AIR_CONTROL
+
+        if inputs.left:
+            s.face_direction = -1
+            s.xs -= MOVE_SPEED * dt * control
+
+        if inputs.right:
+            s.face_direction = 1
+            s.xs += MOVE_SPEED * dt * control
+
+        if inputs.up and not s.is_airborne:
+            s.ys = JUMP_SPEED
+            s.is_airborne = True
+
+        if inputs.down and not s.is_airborne:
+            s.xs += BOOST_POWER * s.face_direction * dt
+
+        current_speed = s.speed
+        if current_speed > MAX_SPEED and not s.is_airborne:
+            scale = MAX_SPEED / current_speed
+            s.xs *= scale
+            s.ys *= scale
+
+    s.time += dt
+    s.frame += 1
+    return s
+
+
+def run(state, input_stream, dt=FIXED_DT):
+    """
+    Steps a state through a sequence of Inputs without any window.
+    Stops early once the run is over. Returns the final state.
+    """
+    for inputs in input_stream:
+        state = step(state, inputs, dt)
+        if state.outcome:
+            break
+    return state
+
+
+# Настраиваемые параметры физики для пакетного режима и перебора
+Params = namedtuple(
+    "Params",
+    ["gravity", "move_speed", "boost", "slope_damping"],
+    defaults=(GRAVITY, MOVE_SPEED, BOOST_POWER, SLOPE_DAMPING)
+)
+
+RUNNING, WIN, LOSE = 0, 1, 2
+
+
+class BatchState:
+    """
+    N independent bodies on one course, kept as NumPy arrays.
+    Each body can have its own Params, so a whole parameter sweep
+    or a set of ghost racers advances in a single step_batch() call.
+    """
+
+    def __init__(self, heightfield, n, params=None, x=400, y=500, xs=0.0, ys=-200.0):
+        self.heightfield = heightfield
+        self.n = n
+        self.x = np.full(n, float(x))
+        self.y = np.full(n, float(y))
+        self.xs = np.full(n, float(xs))
+        self.ys = np.full(n, float(ys))
+        self.face_direction = np.ones(n)
+        self.is_airborne = np.zeros(n, dtype=bool)
+        self.hp = np.full(n, 100)
+        self.time = np.zeros(n)
+        self.invulnerable = np.zeros(n)
+        self.outcome = np.full(n, RUNNING)
+
+        params = np.array(params if params is not None else [Params()] * n, dtype=float).reshape(n, 4)
+        self.gravity, self.move_speed, self.boost, self.slope_damping = params.T
+
+    def copy(self):
+        state = copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                setattr(state, name, value.copy())
+        return state
+
+
+def hits_spike_batch(state, bodies):
+    """Vectorized hits_spike() for the given body indices. Returns a boolean mask."""
+    chunk_width = CHUNK_TILES * TILE_LEN
+    reach = PLAYER_HALF_SIZE + SPIKE_HALF_WIDTH
+    x = state.x[bodies]
+    y = state.y[bodies]
+
+    chunks = np.unique(np.concatenate([np.floor((x - reach) / chunk_width), np.floor((x + reach) / chunk_width)]))
+    spikes = [state.heightfield.spikes(int(c)) for c in chunks]
+    spike_x = np.concatenate([s[0] for s in spikes])
+    spike_y = np.concatenate([s[1] for s in spikes])
+    if len(spike_x) == 0:
+        return np.zeros(len(bodies), dtype=bool)
+
+    near_x = np.abs(x[:, None] - spike_x[None, :]) < reach
+    near_y = np.abs(y[:, None] - spike_y[None, :]) < PLAYER_HALF_SIZE + SPIKE_HALF_HEIGHT
+    return np.any(near_x & near_y, axis=1)
+
+
+def step_batch(state, inputs, dt=FIXED_DT):
+    """
+    Vectorized step() for a BatchState. inputs is one Inputs shared by all
+    bodies or an (n, 4) boolean array of left/right/up/down per body.
+    Returns a new BatchState.
+    """
+    s = state.copy()
+    left, right, up, down = np.broadcast_to(np.asarray(inputs, dtype=bool), (s.n, 4)).T
+
+    running = s.outcome == RUNNING
+    s.outcome[running & (s.hp <= 0)] = LOSE
+    if s.heightfield.finish_x is not None:
+        finished = (s.x >= s.heightfield.finish_x) | (s.y < -500)
+        s.outcome[running & (s.outcome == RUNNING) & finished] = WIN
+    active = s.outcome == RUNNING
+    if not active.any():
+        return s
+
+    s.y[active] += s.ys[active] * dt
+    s.x[active] += s.xs[active] * dt
+
+    wall = active & (s.x < PLAYER_HALF_SIZE)
+    s.x[wall] = PLAYER_HALF_SIZE
+    s.xs[wall] = np.maximum(s.xs[wall], 0)
+
+    s.invulnerable[active] = np.maximum(s.invulnerable[active] - dt, 0.0)
+    ready = np.flatnonzero(active & (s.invulnerable == 0))
+    if len(ready):
+        hit = ready[hits_spike_batch(s, ready)]
+        s.hp[hit] -= SPIKE_DAMAGE
+        s.y[hit] += 25
+        s.ys[hit] += SPIKE_KNOCKBACK
+        s.invulnerable[hit] = INVULNERABLE_TIME
+
+    # Поверхность под всеми телами одним запросом к рельефу
+    height, nx, ny, angle, has_ground = s.heightfield.surfaces(s.x)
+    bottom = s.y - PLAYER_HALF_SIZE
+    airborne = ~has_ground | (bottom > height + GROUND_CONTACT)
+    grounded = active & ~airborne
+    falling = active & airborne
+
+    sink = grounded & (bottom < height)
+    s.y[sink] = height[sink] + PLAYER_HALF_SIZE
+
+    slope = grounded & (np.abs(angle) > SLOPE_MIN_ANGLE)
+    normal_speed = s.xs * nx + s.ys * ny
+    push = slope & (normal_speed < 0)
+    g = s.gravity
+    s.xs[push] -= (normal_speed * nx)[push]
+    s.ys[push] -= (normal_speed * ny)[push]
+    s.xs[push] += (g * ny * nx * dt * 60)[push]
+    s.ys[push] += ((g * ny * ny - g) * dt * 60)[push]
+
+    rad_velocity = normalize(np.sqrt(s.xs * s.xs + s.ys * s.ys), 0, 2000, 0, radians(90))
+    stick = slope & (rad_velocity < angle + 0.5)
+    s.xs[stick] *= s.slope_damping[stick]
+    s.ys[stick] *= s.slope_damping[stick]
+
+    flat = grounded & ~slope
+    s.ys[flat] = np.maximum(s.ys[flat], 0)
+    s.xs[flat] *= FLAT_FRICTION
+
+    s.ys[falling] = np.maximum(s.ys[falling] - g[falling] * dt * 60, -MAX_FALL_SPEED)
+
+    # ============ CONTROLS ============
+    control = s.move_speed * dt * np.where(airborne, AIR_CONTROL, 1)
+    go_left = active & left
+    go_right = active & right
+    s.face_direction[go_left] = -1
+    s.xs[go_left] -= control[go_left]
+    s.face_direction[go_right] = 1
+    s.xs[go_right] += control[go_right]
+
+    jump = active & up & ~airborne
+    s.ys[jump] = JUMP_SPEED
+    airborne |= jump
+
+    boost = active & down & ~airborne
+    s.xs[boost] += (s.boost * s.face_direction * dt)[boost]
+
+    speed = np.sqrt(s.xs * s.xs + s.ys * s.ys)
+    cap = active & ~airborne & (speed > MAX_SPEED)
+    scale = MAX_SPEED / speed[cap]
+    s.xs[cap] *= scale
+    s.ys[cap] *= scale
+
+    s.is_airborne[active] = airborne[active]
+    s.time[active] += dt
+    return s
+
+
+def run_batch(state, input_stream, dt=FIXED_DT):
+    """Steps a BatchState through a sequence of inputs until every body is done."""
+    for inputs in input_stream:
+        state = step_batch(state, inputs, dt)
+        if not (state.outcome == RUNNING).any():
+            break
+    return state
+
+
+def _sweep_worker(level, seed, params, input_stream, dt):
+    state = run_batch(BatchState(Heightfield(level, seed), len(params), params), input_stream, dt)
+    return state.outcome, state.time, state.x, state.hp
+
+
+def sweep(level, seed, params, input_stream, dt=FIXED_DT, workers=None):
+    """
+    Runs one body per Params over the same course and input stream.
+    With workers > 1 the parameter sets are split across a process pool.
+    Returns outcome, time, x and hp arrays in the order of params.
+    """
+    input_stream = list(input_stream)
+    if not workers or workers < 2:
+        return _sweep_worker(level, seed, params, input_stream, dt)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    parts = [part.tolist() for part in np.array_split(np.array(params, dtype=float), workers) if len(part)]
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(
+            _sweep_worker,
+            [level] * len(parts), [seed] * len(parts), parts, [input_stream] * len(parts), [dt] * len(parts)
+        ))
+    return tuple(np.concatenate(column) for column in zip(*results))
@@ -0,0 +1,360 @@
+from collections import namedtuple
+from functools import lru_cache
+from math import floor, sqrt
+
+import arcade
+import numpy as np
+
+import assets
+
+
+TILE_LEN = 64
+WALL_TEXTURE_WIDTH = 32
+WALL_TEXTURE_HEIGHT = 11
+
+# Стриминг рельефа: ширина чанка в тайлах и сколько чанков держать вокруг игрока
+CHUNK_TILES = 32
+CHUNKS_BEHIND = 1
+CHUNKS_AHEAD = 2
+GRADIENT_BLOCK = 256
+SPIKE_CACHE_SIZE = 16
+ANGLE_CACHE_SIZE = 16
+
+# Параметры уровней: длина мира, число узлов шума, амплитуда рельефа и шипы.
+# world_len=None - бесконечный уровень, узлы шума идут через node_spacing.
+LEVELS = {
+    1: {
+        "world_len": 16000,
+        "nodes": 14,
+        "amplitude": 500,
+        "spikes": 0,
+        "spike_range": 0,
+        "spike_lift": 0,
+        "seed": 1,
+    },
+    2: {
+        "world_len": 32000,
+        "nodes": 14,
+        "amplitude": 2000,
+        "spikes": 5,
+        "spike_range": 32000 // 4,
+        "spike_lift": 0,
+        "seed": 2,
+    },
+    3: {
+        "world_len": 16000,
+        "nodes": 14,
+        "amplitude": 500,
+        "spikes": 10,
+        "spike_range": 16000 // 2,
+        "spike_lift": 25,
+        "seed": 3,
+    },
+    4: {
+        "world_len": None,
+        "node_spacing": 1200,
+        "amplitude": 800,
+        "spikes_per_chunk": 1,
+        "spike_lift": 0,
+        "seed": 4,
+    },
+}
+
+_level_cache = {}
+
+# Поверхность рельефа в точке: высота верха стены, единичная нормаль и угол склона в радианах
+Surface = namedtuple("Surface", ["height", "normal", "angle"])
+
+
+def gp_batch(x, gr):
+    """--Get points--
+    Vectorized gp(): takes an array of positions (x) on a grid of nodes (gr).
+    Returns an array of perlin noise values.
+    """
+    x = np.asarray(x, dtype=float)
+    x0 = np.floor(x).astype(int)  # left nodes
+    dx = x - x0
+    s = fade(dx)
+    d0 = gr(x0) * dx
+    d1 = gr(x0 + 1) * (dx - 1)
+    return (1 - s) * d0 + s * d1
+
+
+def fade(dx):
+    """
+    Perlin fade curve 6t^5 - 15t^4 + 10t^3.
+    Only + and * are used, so scalar and NumPy paths round identically.
+    """
+    return dx * dx * dx * (dx * (dx * 6 - 15) + 10)
+
+
+@lru_cache(maxsize=16)
+def _gradient_block(seed, block):
+    """Returns GRADIENT_BLOCK node gradients of an endless level, seeded per block."""
+    rng = np.random.default_rng((seed, block % 2 ** 32))
+    return rng.random(GRADIENT_BLOCK) * 2 - 1
+
+
+class Heightfield:
+    """
+    Terrain of one level computed in NumPy batches.
+    Tiles and spikes for any range of the world are derived from the level seed,
+    so neighbouring chunks always meet at the same height.
+    """
+
+    def __init__(self, level, seed):
+        params = LEVELS[level]
+        self.level = level
+        self.seed = seed
+        self.world_len = params["world_len"]
+        self.amplitude = params["amplitude"]
+        self.spike_lift = params["spike_lift"]
+        self._spike_cache = {}
+        self._angle_cache = {}
+
+        rng = np.random.default_rng(seed)
+        if self.world_len is None:
+            self.node_spacing = params["node_spacing"]
+            self.finish_x = None
+            self.tile_count = None
+            self.spikes_per_chunk = params["spikes_per_chunk"]
+            self.grid = None
+        else:
+            self.node_spacing = self.world_len / params["nodes"]
+            self.finish_x = self.world_len // 2
+            self.tile_count = -(-self.finish_x // TILE_LEN)
+            self.grid = rng.random(params["nodes"]) * 2 - 1
+
+            # Шипы конечного уровня раскладываются сразу на весь мир
+            self.spike_x = rng.integers(0, max(params["spike_range"], 1), params["spikes"]).astype(float)
+
+    def gradients(self, idx):
+        """Returns noise node gradients for an array of node indices."""
+        if self.grid is not None:
+            return self.grid[np.clip(idx, 0, len(self.grid) - 1)]
+
+        out = np.empty(idx.shape)
+        blocks = idx // GRADIENT_BLOCK
+        for block in np.unique(blocks).tolist():
+            mask = blocks == block
+            out[mask] = _gradient_block(self.seed, block)[idx[mask] % GRADIENT_BLOCK]
+        return out
+
+    def gradient(self, i):
+        """Returns the noise node gradient at node index i."""
+        if self.grid is not None:
+            return float(self.grid[min(max(i, 0), len(self.grid) - 1)])
+        return float(_gradient_block(self.seed, i // GRADIENT_BLOCK)[i % GRADIENT_BLOCK])
+
+    def height(self, x):
+        """Returns the terrain node height for world positions x."""
+        return gp_batch(np.asarray(x) / self.node_spacing, self.gradients) * self.amplitude
+
+    def node_height(self, x):
+        """Scalar height(): the terrain node height at a single world position x."""
+        u = x / self.node_spacing
+        x0 = floor(u)
+        dx = u - x0
+        s = fade(dx)
+        d0 = self.gradient(x0) * dx
+        d1 = self.gradient(x0 + 1) * (dx - 1)
+        return ((1 - s) * d0 + s * d1) * self.amplitude
+
+    def surface(self, x):
+        """
+        Returns the Surface of the wall tops at world position x,
+        or None where the level has no ground.
+        """
+        k = floor(x / TILE_LEN)
+        if k < 0 or (self.tile_count is not None and k >= self.tile_count - 1):
+            return None
+
+        x0 = k * TILE_LEN
+        y0 = self.node_height(x0)
+        dy = self.node_height(x0 + TILE_LEN) - y0
+        length = sqrt(dy * dy + TILE_LEN * TILE_LEN)
+
+        # Верх стены лежит над осью тайла на половину его толщины
+        scale = length / WALL_TEXTURE_WIDTH
+        half_thickness = WALL_TEXTURE_HEIGHT * scale / 2 * length / TILE_LEN
+
+        height = y0 + dy * (x - x0) / TILE_LEN + half_thickness
+        return Surface(height, (-dy / length, TILE_LEN / length), self.slope_angle(k))
+
+    def surfaces(self, x):
+        """
+        Batched surface(): returns height, normal x, normal y, angle (radians)
+        and a has-ground mask for an array of world positions x.
+        """
+        x = np.asarray(x, dtype=float)
+        k = np.floor(x / TILE_LEN)
+        valid = k >= 0
+        if self.tile_count is not None:
+            valid &= k < self.tile_count - 1
+
+        x0 = k * TILE_LEN
+        y0 = self.height(x0)
+        dy = self.height(x0 + TILE_LEN) - y0
+        length = np.sqrt(dy * dy + TILE_LEN * TILE_LEN)
+
+        scale = length / WALL_TEXTURE_WIDTH
+        half_thickness = WALL_TEXTURE_HEIGHT * scale / 2 * length / TILE_LEN
+
+        height = y0 + dy * (x - x0) / TILE_LEN + half_thickness
+        angle = self.slope_angles(np.maximum(k, 0).astype(int))
+        return height, -dy / length, TILE_LEN / length, angle, valid
+
+    def slope_angle(self, k):
+        """Returns the slope angle (radians) of the tile starting at node k * TILE_LEN."""
+        block, i = divmod(k, GRADIENT_BLOCK)
+        return float(self._angle_block(block)[i])
+
+    def slope_angles(self, k):
+        """Batched slope_angle() for an array of tile indices."""
+        out = np.empty(k.shape)
+        blocks = k // GRADIENT_BLOCK
+        for block in np.unique(blocks).tolist():
+            mask = blocks == block
+            out[mask] = self._angle_block(block)[k[mask] % GRADIENT_BLOCK]
+        return out
+
+    def _angle_block(self, block):
+        # math.atan2 и np.arctan2 расходятся в последнем бите, поэтому углы склонов
+        # считаются один раз таблицей и общие для скалярного и пакетного шага
+        if block not in self._angle_cache:
+            if len(self._angle_cache) >= ANGLE_CACHE_SIZE:
+                self._angle_cache.clear()
+            x0 = (block * GRADIENT_BLOCK + np.arange(GRADIENT_BLOCK)) * float(TILE_LEN)
+            y0 = self.height(x0)
+            self._angle_cache[block] = np.arctan2(self.height(x0 + TILE_LEN) - y0, TILE_LEN)
+        return self._angle_cache[block]
+
+    def tiles(self, start, stop):
+        """
+        Returns x, y, angle and scale arrays of wall tiles [start, stop).
+        Tile k spans the nodes at (k - 1) * TILE_LEN and k * TILE_LEN.
+        """
+        if self.tile_count is not None:
+            stop = min(stop, self.tile_count)
+        k = np.arange(max(start, 1), max(stop, 1))
+        node_x = k * float(TILE_LEN)
+        prev_y = self.height(node_x - TILE_LEN)
+        dy = self.height(node_x) - prev_y
+        x = node_x - TILE_LEN / 2
+        y = prev_y + dy / 2
+        angle = -np.degrees(np.arctan2(dy, TILE_LEN))
+        scale = np.hypot(dy, TILE_LEN) / WALL_TEXTURE_WIDTH
+        return x, y, angle, scale
+
+    def spikes(self, chunk):
+        """Returns x, y and angle arrays of the spikes in a chunk."""
+        if chunk not in self._spike_cache:
+            if len(self._spike_cache) >= SPIKE_CACHE_SIZE:
+                self._spike_cache.clear()
+            self._spike_cache[chunk] = self._build_spikes(chunk)
+        return self._spike_cache[chunk]
+
+    def _build_spikes(self, chunk):
+        chunk_width = CHUNK_TILES * TILE_LEN
+        if chunk < 0:
+            x = np.empty(0)
+        elif self.world_len is None:
+            rng = np.random.default_rng((self.seed, chunk, 1))
+            x = chunk * chunk_width + rng.integers(0, chunk_width, self.spikes_per_chunk).astype(float)
+        else:
+            x = self.spike_x[(self.spike_x >= chunk * chunk_width) & (self.spike_x < (chunk + 1) * chunk_width)]
+
+        # Шипы ставятся прямо на поверхность рельефа
+        y = self.height(x)
+        dy = self.height(x + TILE_LEN) - y
+        angle = -np.degrees(np.arctan2(dy, TILE_LEN))
+        return x, y + self.spike_lift, angle
+
+
+class TerrainChunks:
+    """
+    Keeps walls and spikes only for the chunks around the player.
+    Chunks ahead are generated on demand, chunks behind are evicted and
+    their sprites recycled, so memory and the sprite lists stay bounded
+    however long the course is.
+    """
+
+    def __init__(self, heightfield):
+        self.heightfield = heightfield
+        self.walls = arcade.SpriteList()
+        self.spikes = arcade.SpriteList()
+        self.chunks = {}
+        self.center = None
+
+        self.wall_texture = assets.texture("sprites/wall.png")
+        self.spike_texture = assets.texture("sprites/spikes.png")
+        self._free_walls = []
+        self._free_spikes = []
+
+        if heightfield.tile_count is None:
+            self.last_chunk = None
+        else:
+            self.last_chunk = (heightfield.tile_count - 1) // CHUNK_TILES
+
+    def update(self, x):
+        """Streams chunks in and out around world position x."""
+        center = max(int(x // (CHUNK_TILES * TILE_LEN)), 0)
+        if center == self.center:
+            return
+        self.center = center
+
+        first = max(center - CHUNKS_BEHIND, 0)
+        last = center + CHUNKS_AHEAD
+        if self.last_chunk is not None:
+            last = min(last, self.last_chunk)
+        needed = set(range(first, last + 1))
+
+        for chunk in [c for c in self.chunks if c not in needed]:
+            self.evict(chunk)
+        for chunk in sorted(needed - self.chunks.keys()):
+            self.load(chunk)
+
+    def load(self, chunk):
+        walls = []
+        x, y, angle, scale = self.heightfield.tiles(chunk * CHUNK_TILES, (chunk + 1) * CHUNK_TILES)
+        for cx, cy, a, s in zip(x.tolist(), y.tolist(), angle.tolist(), scale.tolist()):
+            tile = self._free_walls.pop() if self._free_walls else arcade.Sprite(self.wall_texture)
+            tile.scale = s
+            tile.position = cx, cy
+            tile.angle = a
+            walls.append(tile)
+        self.walls.extend(walls)
+
+        spikes = []
+        x, y, angle = self.heightfield.spikes(chunk)
+        for cx, cy, a in zip(x.tolist(), y.tolist(), angle.tolist()):
+            spike = self._free_spikes.pop() if self._free_spikes else arcade.Sprite(self.spike_texture, scale=0.2)
+            spike.position = cx, cy
+            spike.angle = a
+            spikes.append(spike)
+        self.spikes.extend(spikes)
+
+        self.chunks[chunk] = (walls, spikes)
+
+    def evict(self, chunk):
+        walls, spikes = self.chunks.pop(chunk)
+        for tile in walls:
+            self.walls.remove(tile)
+        for spike in spikes:
+            self.spikes.remove(spike)
+        self._free_walls.extend(walls)
+        self._free_spikes.extend(spikes)
+
+
+def load_level(level, seed=None):
+    """
+    Returns (heightfield, chunks) for a level.
+    Levels are cached by (level, seed), so restarts reuse streamed chunks.
+    """
+    if seed is None:
+        seed = LEVELS[level]["seed"]
+    key = (level, seed)
+    if key not in _level_cache:
+        heightfield = Heightfield(level, seed)
+        _level_cache[key] = (heightfield, TerrainChunks(heightfield))
+    return _level_cache[key]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import sim
+from terrain import LEVELS, Heightfield
+
+
+STEPS = 60 * 20
+BODIES = 6
+HOLD = 30  # Кадров между сменами ввода
+
+OUTCOMES = {None: sim.RUNNING, "win": sim.WIN, "lose": sim.LOSE}
+
+
+def random_inputs(seed, n, steps):
+    """Returns (steps, n, 4) left/right/up/down inputs held for HOLD frames at a time."""
+    rng = np.random.default_rng(seed)
+    held = rng.random((-(-steps // HOLD), n, 4)) < (0.2, 0.7, 0.1, 0.5)
+    held[:, 0] = (False, True, False, True)  # Один призрак всегда жмёт RIGHT+DOWN
+    return np.repeat(held, HOLD, axis=0)[:steps]
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_surfaces_match_surface(level):
+    heightfield = Heightfield(level, LEVELS[level]["seed"])
+    end = heightfield.finish_x or 32000
+    x = np.random.default_rng(level).uniform(0, end, 5000)
+
+    height, nx, ny, angle, valid = heightfield.surfaces(x)
+    for i in np.flatnonzero(valid).tolist():
+        surface = heightfield.surface(float(x[i]))
+        assert surface == (height[i], (nx[i], ny[i]), angle[i]), f"level {level}, x = {x[i]}"
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_step_batch_matches_step(level):
+    heightfield = Heightfield(level, LEVELS[level]["seed"])
+    inputs = random_inputs(level, BODIES, STEPS)
+
+    states = [sim.SimState(heightfield) for _ in range(BODIES)]
+    batch = sim.BatchState(heightfield, BODIES)
+    for frame, row in enumerate(inputs):
+        states = [sim.step(state, sim.Inputs(*keys.tolist()), sim.FIXED_DT) for state, keys in zip(states, row)]
+        batch = sim.step_batch(batch, row)
+        for i, state in enumerate(states):
+            expected = (state.x, state.y, state.xs, state.ys, state.hp, state.time,
+                        state.is_airborne, OUTCOMES[state.outcome])
+            actual = (batch.x[i], batch.y[i], batch.xs[i], batch.ys[i], batch.hp[i], batch.time[i],
+                      batch.is_airborne[i], batch.outcome[i])
+            assert actual == expected, f"level {level}, body {i} diverged at frame {frame}"
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_run_batch_matches_run(level):
+    heightfield = Heightfield(level, LEVELS[level]["seed"])
+    stream = [sim.Inputs(right=True, down=True)] * STEPS
+
+    state = sim.run(sim.SimState(heightfield), stream)
+    batch = sim.run_batch(sim.BatchState(heightfield, 1), stream)
+    assert (batch.x[0], batch.time[0], batch.outcome[0]) == (state.x, state.time, OUTCOMES[state.outcome])
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_left_edge_is_not_a_finish(level):
+    heightfield = Heightfield(level, LEVELS[level]["seed"])
+    stream = [sim.Inputs(left=True, down=True)] * STEPS
+
+    state = sim.run(sim.SimState(heightfield), stream)
+    batch = sim.run_batch(sim.BatchState(heightfield, 1), stream)
+    assert state.outcome is None and batch.outcome[0] == sim.RUNNING